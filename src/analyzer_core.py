@@ -9,9 +9,23 @@ También se encarga de la gestión de errores, la generación de una lista de to
 la creación de un árbol de parseo (tanto en formato LISP como en un modelo
 para QTreeView de PyQt5), y la recopilación de estadísticas del análisis.
 """
+import io
+import re
 import sys
+import copy
 import json
+import math
 import time
+import hashlib
+import functools
+import threading
+from array import array
+from collections.abc import Mapping
+from enum import IntEnum
+try:
+    import orjson # Serializador JSON en C (opcional, más rápido que json)
+except ImportError:
+    orjson = None
 from antlr4 import *
 from antlr4.InputStream import InputStream
 from antlr4.CommonTokenStream import CommonTokenStream
@@ -19,8 +33,7 @@ from antlr4.tree.Trees import Trees
 from antlr4.error.ErrorListener import ErrorListener
 
 # Importaciones de PyQt5 para el modelo del árbol
-from PyQt5.QtGui import QStandardItemModel, QStandardItem
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
 
 # Add 'generated' to sys.path relative to this script's location
 import os
@@ -32,10 +45,34 @@ if generated_dir not in sys.path:
 from NaturalToJsonLexer import NaturalToJsonLexer
 from NaturalToJsonParser import NaturalToJsonParser
 from NaturalToJsonListener import NaturalToJsonListener
+from ir import IRInstruction, IR_CREATE_OBJECT, IR_SET_PROPERTY, IR_CREATE_LIST, IR_APPEND_LIST
 from optimizer import optimize_ir
 
+# Nombres de las reglas del parser (para el modelo del árbol y la vista LISP), calculados una vez
+_RULE_NAMES = tuple(NaturalToJsonParser.ruleNames)
+
 # --- Estructuras de Datos para Análisis Semántico ---
 
+class ValueType(IntEnum):
+    """
+    Códigos compactos de los tipos lógicos de valor.
+    Se usan para guardar los tipos de los elementos de una lista en un
+    `array('b')` (un byte por elemento) en lugar de una lista de cadenas.
+    """
+    STRING = 0
+    NUMBER = 1
+    BOOLEAN = 2
+    UNKNOWN = 3
+
+# Conversión del código de tipo a su nombre ("STRING", ...); solo se usa al exponer la tabla
+_VALUE_TYPE_NAMES = tuple(vt.name for vt in ValueType)
+
+# Nombres de tipo y de entidad, definidos una sola vez y compartidos por la tabla
+# de despacho, el análisis semántico y la tabla de símbolos
+_TYPE_STRING, _TYPE_NUMBER, _TYPE_BOOLEAN, _TYPE_UNKNOWN = _VALUE_TYPE_NAMES
+_ENTITY_OBJECT = "objeto"
+_ENTITY_LIST = "lista"
+
 class SymbolEntry:
     """
     Representa una entrada en la tabla de símbolos.
@@ -55,14 +92,20 @@ class SymbolTable:
     """
     def __init__(self):
         self.symbols = {}
-        # Palabras reservadas del lenguaje (insensibles a mayúsculas/minúsculas)
-        self.reserved_words = {
-            "CREAR", "OBJETO", "LISTA", "CON", "ELEMENTOS", "VERDADERO", "FALSO"
-        }
+        # Palabras reservadas del lenguaje (insensibles a mayúsculas/minúsculas).
+        # Se guardan en minúsculas y se comparan con casefold().
+        self.reserved_words = frozenset({
+            "crear", "objeto", "lista", "con", "elementos", "verdadero", "falso"
+        })
 
     def is_reserved(self, nombre):
-        """Verifica si un nombre es una palabra reservada."""
-        return nombre.upper() in self.reserved_words
+        """
+        Verifica si un nombre es una palabra reservada.
+
+        El lexer ya reconoce las palabras clave como tokens propios, así que un
+        IDENTIFICADOR nunca debería serlo; la verificación se mantiene por seguridad.
+        """
+        return nombre.casefold() in self.reserved_words
 
     def lookup(self, nombre):
         """Busca un símbolo por nombre. Retorna SymbolEntry o None."""
@@ -74,39 +117,134 @@ class SymbolTable:
         Retorna True si se declaró exitosamente.
         Retorna False si el símbolo ya existe (redefinición).
         """
-        if nombre in self.symbols:
-            return False
-        
         entry = SymbolEntry(nombre, tipo_entidad, linea, columna, metadatos)
-        self.symbols[nombre] = entry
-        return True
+        # Una sola búsqueda: setdefault solo inserta si el nombre no existía
+        return self.symbols.setdefault(nombre, entry) is entry
     
     def get_debug_info(self):
         """
         Retorna una representación simplificada de la tabla de símbolos para depuración/tests.
+
+        Formato plano (columnas paralelas en lugar de un diccionario anidado por símbolo):
+            names:    nombres de los símbolos, en orden de declaración.
+            kinds:    tipo de entidad de cada símbolo ("objeto" o "lista").
+            props:    tuplas (objeto, clave, tipo) de las propiedades de los objetos.
+            elements: tuplas (lista, tipo) de los elementos de las listas.
+        Los tipos de elementos de las listas se convierten de códigos (ValueType) a nombres.
+        """
+        return dict(self.debug_view())
+
+    def debug_view(self):
+        """
+        Igual que `get_debug_info`, pero perezosa: cada columna se construye al
+        consultarla (ver `SymbolTableDebugView`).
         """
-        debug_info = {}
-        for name, entry in self.symbols.items():
-            debug_info[name] = {
-                "tipo_entidad": entry.tipo_entidad,
-                "metadatos": entry.metadatos
-            }
-        return debug_info
+        return SymbolTableDebugView(self)
+
+class SymbolTableDebugView(Mapping):
+    """
+    Vista de solo lectura de la tabla de símbolos con el formato de `get_debug_info`.
+
+    Las columnas se construyen al consultarlas, así que el análisis no paga la
+    conversión de toda la tabla si nadie lee `stats['symbols_debug']` (la CLI y
+    la GUI no lo hacen). No admite asignaciones.
+    """
+    __slots__ = ("_symbols",)
+
+    _FIELDS = ("names", "kinds", "props", "elements")
+
+    def __init__(self, symbol_table):
+        self._symbols = symbol_table.symbols
+
+    def __getitem__(self, field):
+        entries = self._symbols.values()
+        if field == "names":
+            return tuple(self._symbols)
+        if field == "kinds":
+            return tuple(entry.tipo_entidad for entry in entries)
+        if field == "props":
+            return tuple(
+                (entry.nombre, clave, tipo)
+                for entry in entries
+                for clave, tipo in entry.metadatos.get("propiedades", {}).items()
+            )
+        if field == "elements":
+            return tuple(
+                (entry.nombre, _VALUE_TYPE_NAMES[code])
+                for entry in entries
+                for code in entry.metadatos.get("tipos_elementos", ())
+            )
+        raise KeyError(field)
+
+    def __iter__(self):
+        return iter(self._FIELDS)
+
+    def __len__(self):
+        return len(self._FIELDS)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
 
 # --- Helpers ---
 
+# Conversión de literales numéricos con caché por texto del token: los mismos
+# literales (0, 1, ...) suelen repetirse y cada texto distinto se convierte una vez.
+_to_int = functools.lru_cache(maxsize=1024)(int)
+_to_float = functools.lru_cache(maxsize=1024)(float)
+
+# Tabla de despacho para valores:
+# tipo de token -> (tipo lógico, código ValueType, conversor a valor nativo).
+# Un 'valor' siempre consta de un único token, así que basta con mirar ctx.start.
+_VALUE_DISPATCH = {
+    NaturalToJsonLexer.STRING: (_TYPE_STRING, ValueType.STRING.value, lambda texto: texto[1:-1]),
+    NaturalToJsonLexer.NUMERO_ENTERO: (_TYPE_NUMBER, ValueType.NUMBER.value, _to_int),
+    NaturalToJsonLexer.NUMERO_DECIMAL: (_TYPE_NUMBER, ValueType.NUMBER.value, _to_float),
+    NaturalToJsonLexer.KW_VERDADERO: (_TYPE_BOOLEAN, ValueType.BOOLEAN.value, lambda _: True),
+    NaturalToJsonLexer.KW_FALSO: (_TYPE_BOOLEAN, ValueType.BOOLEAN.value, lambda _: False),
+}
+
 def get_value_type(ctx:NaturalToJsonParser.ValorContext):
     """
     Determina el tipo lógico de un valor dado su contexto de parseo.
     Retorna: "STRING", "NUMBER", "BOOLEAN" o "UNKNOWN".
     """
-    if ctx.STRING():
-        return "STRING"
-    elif ctx.NUMERO_ENTERO() or ctx.NUMERO_DECIMAL():
-        return "NUMBER"
-    elif ctx.KW_VERDADERO() or ctx.KW_FALSO():
-        return "BOOLEAN"
-    return "UNKNOWN"
+    return resolve_value(ctx)[0]
+
+def get_value_type_code(ctx:NaturalToJsonParser.ValorContext):
+    """
+    Determina el código `ValueType` de un valor (lo que guarda la tabla de
+    símbolos para los elementos de una lista) directamente desde el tipo de
+    token, sin pasar por el nombre del tipo ni convertir el valor.
+    """
+    entry = _VALUE_DISPATCH.get(ctx.start.type)
+    return entry[1] if entry is not None else ValueType.UNKNOWN.value
+
+def resolve_value(ctx:NaturalToJsonParser.ValorContext):
+    """
+    Determina el tipo lógico y el valor nativo de Python de un valor.
+    Retorna: (tipo, valor_nativo); ("UNKNOWN", None) si el token no es un valor.
+
+    El resultado se guarda en el propio contexto (`_cached_value`), ya que el mismo
+    valor es consultado por varios listeners durante el recorrido.
+    """
+    cached = getattr(ctx, "_cached_value", None)
+    if cached is not None:
+        return cached
+    token = ctx.start
+    entry = _VALUE_DISPATCH.get(token.type)
+    if entry is None:
+        result = (_TYPE_UNKNOWN, None)
+    else:
+        tipo, _, convertir = entry
+        result = (tipo, convertir(token.text))
+    ctx._cached_value = result
+    return result
+
+# Patrones precompilados para interpretar los mensajes de error (en inglés) de ANTLR
+_RE_TOKEN_RECOGNITION = re.compile(r"token recognition error at: '(.*)'", re.DOTALL)
+_RE_MISMATCHED_INPUT = re.compile(r"mismatched input .* expecting (.+)", re.DOTALL)
+_RE_EXTRANEOUS_INPUT = re.compile(r"extraneous input .* expecting (.+)", re.DOTALL)
+_RE_MISSING = re.compile(r"missing (.+?) at", re.DOTALL)
 
 # --- Listeners ---
 
@@ -179,12 +317,9 @@ class CustomErrorListener(ErrorListener):
         if is_lexer_error:
             self._lexer_errors += 1
             error_type = "Léxico"
-            if "token recognition error at: '" in msg:
-                # Intenta extraer el carácter problemático del mensaje de ANTLR
-                try:
-                    char_problem = msg.split("token recognition error at: '")[1][:-1]
-                    detailed_msg = f"Carácter inesperado o no reconocido: '{char_problem}'."
-                except IndexError: detailed_msg = "Error de reconocimiento de token no especificado."
+            if match := _RE_TOKEN_RECOGNITION.match(msg):
+                # Extrae el carácter problemático del mensaje de ANTLR
+                detailed_msg = f"Carácter inesperado o no reconocido: '{match.group(1)}'."
             else: detailed_msg = f"Error léxico general: {msg}"
         else:
             # Es un error sintáctico (del parser)
@@ -193,24 +328,15 @@ class CustomErrorListener(ErrorListener):
             offending_text = offendingSymbol.text if offendingSymbol else ""
             if offending_text == '<EOF>': offending_text = "fin de la entrada"
             
-            if "mismatched input" in msg and "expecting" in msg:
-                try:
-                    # Ej: "mismatched input 'X' expecting Y" -> "Se encontró 'X' pero se esperaba Y."
-                    expected_tokens = msg.split("expecting ")[1]
-                    detailed_msg = f"Se encontró '{offending_text}' pero se esperaba {expected_tokens}."
-                except: detailed_msg = f"Entrada no coincide: '{offending_text}'. {msg}"
-            elif "extraneous input" in msg and "expecting" in msg:
-                try:
-                    # Ej: "extraneous input 'X' expecting Y" -> "Entrada adicional 'X'. Se esperaba Y."
-                    expected_tokens = msg.split("expecting ")[1]
-                    detailed_msg = f"Entrada adicional o fuera de lugar: '{offending_text}'. Se esperaba {expected_tokens} antes o después."
-                except: detailed_msg = f"Entrada sobrante: '{offending_text}'. {msg}"
-            elif "missing" in msg and "at" in msg:
-                try:
-                    # Ej: "missing X at 'Y'" -> "Falta X cerca de 'Y'."
-                    missing_token = msg.split("missing ")[1].split(" at")[0]
-                    detailed_msg = f"Falta el símbolo/palabra clave '{missing_token}' cerca de '{offending_text}'."
-                except: detailed_msg = f"Elemento faltante. {msg}"
+            if match := _RE_MISMATCHED_INPUT.match(msg):
+                # Ej: "mismatched input 'X' expecting Y" -> "Se encontró 'X' pero se esperaba Y."
+                detailed_msg = f"Se encontró '{offending_text}' pero se esperaba {match.group(1)}."
+            elif match := _RE_EXTRANEOUS_INPUT.match(msg):
+                # Ej: "extraneous input 'X' expecting Y" -> "Entrada adicional 'X'. Se esperaba Y."
+                detailed_msg = f"Entrada adicional o fuera de lugar: '{offending_text}'. Se esperaba {match.group(1)} antes o después."
+            elif match := _RE_MISSING.match(msg):
+                # Ej: "missing X at 'Y'" -> "Falta X cerca de 'Y'."
+                detailed_msg = f"Falta el símbolo/palabra clave '{match.group(1)}' cerca de '{offending_text}'."
             elif "no viable alternative at input" in msg:
                 # Error genérico cuando el parser no puede encontrar una regla que coincida
                 detailed_msg = f"No se reconoce la estructura del comando cerca de '{offending_text}'. Verifica la sintaxis."
@@ -233,12 +359,13 @@ class CustomErrorListener(ErrorListener):
                  si no se detectaron errores.
         """
         if not self.error_messages: return ""
-        # Construcción del encabezado y lista de errores
-        summary = "╔═════════════════════════════════════╗\n"
-        summary += "║     Resumen de Errores Detectados     ║\n"
-        summary += "╚═════════════════════════════════════╝\n"
-        summary += "\n".join([f"  ⚠️  {emsg}" for emsg in self.error_messages])
-        return summary
+        # Encabezado y lista de errores unidos en una sola operación
+        return "\n".join([
+            "╔═════════════════════════════════════╗",
+            "║     Resumen de Errores Detectados     ║",
+            "╚═════════════════════════════════════╝",
+            *[f"  ⚠️  {emsg}" for emsg in self.error_messages],
+        ])
 
 class SemanticAnalyzer(NaturalToJsonListener):
     """
@@ -249,7 +376,7 @@ class SemanticAnalyzer(NaturalToJsonListener):
     def __init__(self, error_listener, symbol_table):
         self.error_listener = error_listener
         self.symbol_table = symbol_table
-        self.current_symbol_name = None # Para saber a qué símbolo asociar propiedades/elementos
+        self.current_entry = None # SymbolEntry al que se asocian propiedades/elementos
 
     def enterCrear_objeto_cmd(self, ctx:NaturalToJsonParser.Crear_objeto_cmdContext):
         nombre = ctx.nombre_obj.text
@@ -262,13 +389,13 @@ class SemanticAnalyzer(NaturalToJsonListener):
                 linea, columna, 
                 f"El nombre '{nombre}' es una palabra reservada del lenguaje y no puede usarse como identificador."
             )
-            self.current_symbol_name = None
+            self.current_entry = None
             return
 
         # SEM001: Verificar redefinición
         # Inicializamos metadatos con estructura para propiedades
         metadatos = {"propiedades": {}}
-        exito = self.symbol_table.declare(nombre, "objeto", linea, columna, metadatos)
+        exito = self.symbol_table.declare(nombre, _ENTITY_OBJECT, linea, columna, metadatos)
         
         if not exito:
             entry_prev = self.symbol_table.lookup(nombre)
@@ -276,34 +403,35 @@ class SemanticAnalyzer(NaturalToJsonListener):
                 linea, columna,
                 f"Redefinición del símbolo '{nombre}'. Ya fue declarado como '{entry_prev.tipo_entidad}' en la línea {entry_prev.linea}."
             )
-            self.current_symbol_name = None
+            self.current_entry = None
         else:
-            self.current_symbol_name = nombre
+            # Única búsqueda por declaración; los nodos hijos usan la referencia directa
+            self.current_entry = self.symbol_table.lookup(nombre)
 
     def exitCrear_objeto_cmd(self, ctx:NaturalToJsonParser.Crear_objeto_cmdContext):
-        self.current_symbol_name = None
+        self.current_entry = None
 
     def enterPropiedad(self, ctx:NaturalToJsonParser.PropiedadContext):
-        if self.current_symbol_name:
+        entry = self.current_entry
+        if entry:
             clave = ctx.clave.text
             valor_ctx = ctx.valor()
             tipo_valor = get_value_type(valor_ctx)
             
             # SEM005: Regla de Dominio (Propiedades especiales)
-            if clave == "edad" and tipo_valor != "NUMBER":
+            if clave == "edad" and tipo_valor != _TYPE_NUMBER:
                 self.error_listener.add_semantic_error(
                     ctx.start.line, ctx.start.column + 1,
                     f"La propiedad 'edad' debe ser de tipo NUMBER, pero se recibió {tipo_valor}."
                 )
-            elif clave == "activo" and tipo_valor != "BOOLEAN":
+            elif clave == "activo" and tipo_valor != _TYPE_BOOLEAN:
                 self.error_listener.add_semantic_error(
                     ctx.start.line, ctx.start.column + 1,
                     f"La propiedad 'activo' debe ser de tipo BOOLEAN, pero se recibió {tipo_valor}."
                 )
 
             # Guardar tipo en metadatos del símbolo actual
-            entry = self.symbol_table.lookup(self.current_symbol_name)
-            if entry and entry.tipo_entidad == "objeto":
+            if entry.tipo_entidad == _ENTITY_OBJECT:
                 # SEM006: Regla de Consistencia (Mismo objeto, misma propiedad, distinto tipo)
                 if clave in entry.metadatos["propiedades"]:
                     tipo_previo = entry.metadatos["propiedades"][clave]
@@ -327,13 +455,13 @@ class SemanticAnalyzer(NaturalToJsonListener):
                 linea, columna, 
                 f"El nombre '{nombre}' es una palabra reservada del lenguaje y no puede usarse como identificador."
             )
-            self.current_symbol_name = None
+            self.current_entry = None
             return
 
         # SEM001: Verificar redefinición
-        # Inicializamos metadatos con estructura para elementos
-        metadatos = {"tipos_elementos": []}
-        exito = self.symbol_table.declare(nombre, "lista", linea, columna, metadatos)
+        # Inicializamos metadatos con estructura para elementos (códigos de ValueType)
+        metadatos = {"tipos_elementos": array('b')}
+        exito = self.symbol_table.declare(nombre, _ENTITY_LIST, linea, columna, metadatos)
         
         if not exito:
             entry_prev = self.symbol_table.lookup(nombre)
@@ -341,115 +469,125 @@ class SemanticAnalyzer(NaturalToJsonListener):
                 linea, columna,
                 f"Redefinición del símbolo '{nombre}'. Ya fue declarado como '{entry_prev.tipo_entidad}' en la línea {entry_prev.linea}."
             )
-            self.current_symbol_name = None
+            self.current_entry = None
         else:
-            self.current_symbol_name = nombre
+            # Única búsqueda por declaración; los nodos hijos usan la referencia directa
+            self.current_entry = self.symbol_table.lookup(nombre)
 
     def exitCrear_lista_cmd(self, ctx:NaturalToJsonParser.Crear_lista_cmdContext):
-        self.current_symbol_name = None
+        self.current_entry = None
 
     def enterValor(self, ctx:NaturalToJsonParser.ValorContext):
         # Solo nos interesa si estamos dentro de una lista (para objetos lo manejamos en enterPropiedad)
-        if self.current_symbol_name:
-            entry = self.symbol_table.lookup(self.current_symbol_name)
-            if entry and entry.tipo_entidad == "lista":
-                # Verificar si el padre es items_lista para confirmar que es un elemento de lista
-                # (aunque la estructura de la gramática lo garantiza si estamos en enterValor dentro de Crear_lista_cmd)
-                 tipo_valor = get_value_type(ctx)
-                 entry.metadatos["tipos_elementos"].append(tipo_valor)
+        entry = self.current_entry
+        if entry and entry.tipo_entidad == _ENTITY_LIST:
+            # Verificar si el padre es items_lista para confirmar que es un elemento de lista
+            # (aunque la estructura de la gramática lo garantiza si estamos en enterValor dentro de Crear_lista_cmd)
+            entry.metadatos["tipos_elementos"].append(get_value_type_code(ctx))
 
 
 # --- Estructuras para Representación Intermedia (IR) ---
 
-class IRInstruction:
-    """
-    Representa una instrucción de la Representación Intermedia (IR).
-    """
-    def __init__(self, opcode, args):
-        self.opcode = opcode
-        self.args = args
-
-    def to_dict(self):
-        return {"opcode": self.opcode, "args": self.args}
-
 class IRBuilderListener(NaturalToJsonListener):
     """
     Listener que construye la Representación Intermedia (IR) a partir del AST.
-    Genera una lista lineal de instrucciones.
+    Genera una lista lineal de instrucciones `IRInstruction` (ver `ir.py`).
+
+    Los nombres de entidades y las claves se internan (`sys.intern`): se repiten
+    en muchas instrucciones, y el optimizador los usa como claves de diccionario,
+    donde una cadena internada se compara por identidad antes que por contenido.
     """
     def __init__(self):
         self.ir_instructions = []
         self.current_obj_name = None
         self.current_list_name = None
+        self._in_items_lista = False # True mientras se recorren los elementos de una lista
 
     def get_instructions(self):
-        return [instr.to_dict() for instr in self.ir_instructions]
+        return self.ir_instructions
+
+    def _emit(self, opcode, args):
+        self.ir_instructions.append(IRInstruction(opcode, args))
 
     def enterCrear_objeto_cmd(self, ctx:NaturalToJsonParser.Crear_objeto_cmdContext):
-        nombre = ctx.nombre_obj.text
+        nombre = sys.intern(ctx.nombre_obj.text)
         self.current_obj_name = nombre
-        self.ir_instructions.append(IRInstruction("IR_CREATE_OBJECT", [nombre]))
+        self._emit(IR_CREATE_OBJECT, [nombre])
 
     def exitCrear_objeto_cmd(self, ctx:NaturalToJsonParser.Crear_objeto_cmdContext):
         self.current_obj_name = None
 
     def exitPropiedad(self, ctx:NaturalToJsonParser.PropiedadContext):
         if self.current_obj_name:
-            clave = ctx.clave.text
-            valor_ctx = ctx.valor()
-            tipo_valor = get_value_type(valor_ctx)
+            clave = sys.intern(ctx.clave.text)
+            # Tipo lógico y valor nativo de Python
+            tipo_valor, valor_nativo = resolve_value(ctx.valor())
             
-            # Extraer valor nativo de Python
-            valor_nativo = None
-            if valor_ctx.STRING():
-                valor_nativo = valor_ctx.STRING().getText()[1:-1]
-            elif valor_ctx.NUMERO_ENTERO():
-                valor_nativo = int(valor_ctx.NUMERO_ENTERO().getText())
-            elif valor_ctx.NUMERO_DECIMAL():
-                valor_nativo = float(valor_ctx.NUMERO_DECIMAL().getText())
-            elif valor_ctx.KW_VERDADERO():
-                valor_nativo = True
-            elif valor_ctx.KW_FALSO():
-                valor_nativo = False
-            
-            self.ir_instructions.append(IRInstruction(
-                "IR_SET_PROPERTY", 
-                [self.current_obj_name, clave, tipo_valor, valor_nativo]
-            ))
+            self._emit(IR_SET_PROPERTY, [self.current_obj_name, clave, tipo_valor, valor_nativo])
 
     def enterCrear_lista_cmd(self, ctx:NaturalToJsonParser.Crear_lista_cmdContext):
-        nombre = ctx.nombre_lista.text
+        nombre = sys.intern(ctx.nombre_lista.text)
         self.current_list_name = nombre
-        self.ir_instructions.append(IRInstruction("IR_CREATE_LIST", [nombre]))
+        self._emit(IR_CREATE_LIST, [nombre])
 
     def exitCrear_lista_cmd(self, ctx:NaturalToJsonParser.Crear_lista_cmdContext):
         self.current_list_name = None
 
+    def enterItems_lista(self, ctx:NaturalToJsonParser.Items_listaContext):
+        self._in_items_lista = True
+
+    def exitItems_lista(self, ctx:NaturalToJsonParser.Items_listaContext):
+        self._in_items_lista = False
+
     def exitValor(self, ctx:NaturalToJsonParser.ValorContext):
-        # Verificar si estamos dentro de una lista
-        # El padre de un valor en una lista es Items_listaContext
-        if self.current_list_name and isinstance(ctx.parentCtx, NaturalToJsonParser.Items_listaContext):
-            tipo_valor = get_value_type(ctx)
-            
-            # Extraer valor nativo
-            valor_nativo = None
-            if ctx.STRING():
-                valor_nativo = ctx.STRING().getText()[1:-1]
-            elif ctx.NUMERO_ENTERO():
-                valor_nativo = int(ctx.NUMERO_ENTERO().getText())
-            elif ctx.NUMERO_DECIMAL():
-                valor_nativo = float(ctx.NUMERO_DECIMAL().getText())
-            elif ctx.KW_VERDADERO():
-                valor_nativo = True
-            elif ctx.KW_FALSO():
-                valor_nativo = False
+        # Verificar si estamos dentro de una lista (el valor es un elemento de items_lista)
+        if self.current_list_name and self._in_items_lista:
+            # Tipo lógico y valor nativo de Python
+            tipo_valor, valor_nativo = resolve_value(ctx)
             
-            self.ir_instructions.append(IRInstruction(
-                "IR_APPEND_LIST",
-                [self.current_list_name, tipo_valor, valor_nativo]
-            ))
+            self._emit(IR_APPEND_LIST, [self.current_list_name, tipo_valor, valor_nativo])
 
 # --- Listener para Construir JSON ---
+# Rango de enteros que orjson serializa (64 bits con signo o sin signo)
+_ORJSON_INT_MIN = -(2 ** 63)
+_ORJSON_INT_MAX = 2 ** 64 - 1
+
+def _orjson_can_serialize_tokens(tokens):
+    """
+    Indica si `orjson` produce para el documento el mismo JSON que `json`,
+    mirando sus literales numéricos (todo número del JSON viene de un token
+    NUMERO_ENTERO o NUMERO_DECIMAL), antes del recorrido.
+
+    orjson rechaza los enteros de más de 64 bits y, peor, escribe los flotantes
+    no finitos (ej. un NUMERO_DECIMAL que desborda a inf) como `null` sin avisar;
+    `json` los escribe como `Infinity`.
+    """
+    entero, decimal = NaturalToJsonLexer.NUMERO_ENTERO, NaturalToJsonLexer.NUMERO_DECIMAL
+    for t in tokens:
+        tipo = t.type
+        if tipo == entero:
+            if not _ORJSON_INT_MIN <= _to_int(t.text) <= _ORJSON_INT_MAX:
+                return False
+        elif tipo == decimal and not math.isfinite(_to_float(t.text)):
+            return False
+    return True
+
+def _dumps_indented(value, use_orjson=False):
+    """
+    Serializa un valor a JSON con indentación de 2 espacios.
+
+    Los dos serializadores difieren en el texto de algunos flotantes
+    (orjson: `1.23e-9`, json: `1.23e-09`); el valor numérico es el mismo.
+
+    Args:
+        value: Valor a serializar.
+        use_orjson (bool): Usar `orjson` en lugar de `json`. Se decide una vez
+            por documento con `_orjson_can_serialize_tokens`.
+    """
+    if use_orjson:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(value, indent=2, ensure_ascii=False)
+
 class JsonBuilderListener(NaturalToJsonListener):
     """
     Listener de ANTLR que construye una estructura de datos Python (diccionario)
@@ -458,27 +596,64 @@ class JsonBuilderListener(NaturalToJsonListener):
     Este listener maneja el estado mientras recorre el árbol para crear
     objetos y listas anidadas según la gramática definida.
     """
-    def __init__(self):
+    def __init__(self, stream=False, use_orjson=False):
         """
         Inicializa el constructor de JSON.
 
         Configura las estructuras de datos internas para almacenar el JSON resultante.
+
+        Args:
+            stream (bool): Si es True, cada comando se serializa en cuanto termina
+                y solo se guardan los fragmentos de texto, sin construir el
+                diccionario `result_data` completo (útil para salidas grandes).
+            use_orjson (bool): Serializar con `orjson` (ver `_dumps_indented`).
+                Se elige una vez para todo el documento, igual en ambos modos, para
+                que el modo stream produzca exactamente el JSON del modo normal.
         """
+        self.stream = stream
+        self.use_orjson = use_orjson
         self.result_data = {}
+        self._fragments = [] # Fragmentos '  "nombre": valor' (solo en modo stream)
         self.current_object_name = None
         self.current_object_props = {}
         self.current_list_name = None
         self.current_list_items = []
         self.current_key = None
+        self._in_items_lista = False # True mientras se recorren los elementos de una lista
 
     def get_final_json_string(self):
         """
         Serializa la estructura de datos interna a una cadena JSON formateada.
 
+        En modo stream solo une los fragmentos ya serializados.
+
         Returns:
             str: La representación JSON de los datos procesados.
         """
-        return json.dumps(self.result_data, indent=2, ensure_ascii=False)
+        if self.stream:
+            if not self._fragments:
+                return "{}"
+            return "{\n" + ",\n".join(self._fragments) + "\n}"
+        return _dumps_indented(self.result_data, self.use_orjson)
+
+    def get_command_count(self):
+        """
+        Retorna el número de comandos (objetos y listas) almacenados en el resultado.
+        """
+        return len(self._fragments) if self.stream else len(self.result_data)
+
+    def _store(self, name, value):
+        """
+        Almacena el valor de un comando terminado bajo su nombre.
+        En modo stream lo serializa de inmediato (con la indentación que tendría
+        dentro del objeto raíz) y descarta la estructura Python.
+        """
+        if self.stream:
+            key = json.dumps(name, ensure_ascii=False)
+            body = _dumps_indented(value, self.use_orjson).replace("\n", "\n  ")
+            self._fragments.append(f"  {key}: {body}")
+        else:
+            self.result_data[name] = value
 
     def enterCrear_objeto_cmd(self, ctx:NaturalToJsonParser.Crear_objeto_cmdContext):
         """
@@ -494,7 +669,7 @@ class JsonBuilderListener(NaturalToJsonListener):
         Almacena el objeto JSON completado en el resultado final.
         """
         if self.current_object_name:
-            self.result_data[self.current_object_name] = self.current_object_props
+            self._store(self.current_object_name, self.current_object_props)
         # Resetea el nombre del objeto actual para el siguiente comando
         self.current_object_name = None
 
@@ -530,122 +705,360 @@ class JsonBuilderListener(NaturalToJsonListener):
         Almacena la lista JSON completada en el resultado final.
         """
         if self.current_list_name:
-            self.result_data[self.current_list_name] = self.current_list_items
+            self._store(self.current_list_name, self.current_list_items)
         # Resetea el nombre de la lista actual
         self.current_list_name = None
 
+    def enterItems_lista(self, ctx:NaturalToJsonParser.Items_listaContext):
+        """
+        Invocado al entrar en la regla 'items_lista'.
+        Indica que los valores siguientes son elementos de la lista actual.
+        """
+        self._in_items_lista = True
+
+    def exitItems_lista(self, ctx:NaturalToJsonParser.Items_listaContext):
+        """
+        Invocado al salir de la regla 'items_lista'.
+        """
+        self._in_items_lista = False
+
     def exitValor(self, ctx:NaturalToJsonParser.ValorContext):
-        processed_value = None
-        if ctx.STRING():
-            processed_value = ctx.STRING().getText()[1:-1]
-        elif ctx.NUMERO_ENTERO():
-            processed_value = int(ctx.NUMERO_ENTERO().getText())
-        elif ctx.NUMERO_DECIMAL():
-            processed_value = float(ctx.NUMERO_DECIMAL().getText())
-        elif ctx.KW_VERDADERO():
-            processed_value = True
-        elif ctx.KW_FALSO():
-            processed_value = False
+        _, processed_value = resolve_value(ctx)
         
-        # Determina dónde debe ir el valor procesado (a una propiedad de objeto o a una lista)
-        parent_ctx = ctx.parentCtx
-        if isinstance(parent_ctx, NaturalToJsonParser.PropiedadContext):
-            # Si el padre es una 'propiedad', el valor pertenece a esa propiedad.
-            # Se añade 'valor_procesado' al contexto de la propiedad para que 'exitPropiedad' lo use.
-            parent_ctx.valor_procesado = processed_value
-        elif self.current_list_name is not None and isinstance(parent_ctx, NaturalToJsonParser.Items_listaContext):
-            # Si estamos dentro de una lista (current_list_name está activo) y el padre es 'items_lista',
-            # el valor es un elemento de esa lista.
-             self.current_list_items.append(processed_value)
-        elif isinstance(parent_ctx, NaturalToJsonParser.Items_listaContext):
-            # Caso de respaldo si current_list_name no estuviera activo pero el contexto es items_lista
-            # (esto podría indicar un estado inesperado, pero se maneja por seguridad).
+        # Determina dónde debe ir el valor procesado (a una lista o a una propiedad de objeto).
+        # Según la gramática, un 'valor' solo aparece dentro de 'items_lista' o de 'propiedad'.
+        if self._in_items_lista:
+            # El valor es un elemento de la lista actual.
             self.current_list_items.append(processed_value)
+        else:
+            # El padre es una 'propiedad': se añade 'valor_procesado' a su contexto
+            # para que 'exitPropiedad' lo use.
+            ctx.parentCtx.valor_procesado = processed_value
+
+
+# --- Listener compuesto (un solo recorrido del árbol) ---
+class FusedListener(NaturalToJsonListener):
+    """
+    Listener que reenvía los eventos del recorrido a varios listeners
+    (análisis semántico, construcción de IR y de JSON), en el orden dado.
+
+    Permite que todos ellos se ejecuten en un único recorrido del árbol de
+    parseo en lugar de un recorrido por listener.
+    """
+    def __init__(self, *listeners):
+        self.listeners = listeners
+
+    def enterCrear_objeto_cmd(self, ctx:NaturalToJsonParser.Crear_objeto_cmdContext):
+        for listener in self.listeners:
+            listener.enterCrear_objeto_cmd(ctx)
 
+    def exitCrear_objeto_cmd(self, ctx:NaturalToJsonParser.Crear_objeto_cmdContext):
+        for listener in self.listeners:
+            listener.exitCrear_objeto_cmd(ctx)
+
+    def enterPropiedad(self, ctx:NaturalToJsonParser.PropiedadContext):
+        for listener in self.listeners:
+            listener.enterPropiedad(ctx)
+
+    def exitPropiedad(self, ctx:NaturalToJsonParser.PropiedadContext):
+        for listener in self.listeners:
+            listener.exitPropiedad(ctx)
+
+    def enterCrear_lista_cmd(self, ctx:NaturalToJsonParser.Crear_lista_cmdContext):
+        for listener in self.listeners:
+            listener.enterCrear_lista_cmd(ctx)
+
+    def exitCrear_lista_cmd(self, ctx:NaturalToJsonParser.Crear_lista_cmdContext):
+        for listener in self.listeners:
+            listener.exitCrear_lista_cmd(ctx)
 
-# ---  Listener para construir el QStandardItemModel para QTreeView ---
+    def enterItems_lista(self, ctx:NaturalToJsonParser.Items_listaContext):
+        for listener in self.listeners:
+            listener.enterItems_lista(ctx)
+
+    def exitItems_lista(self, ctx:NaturalToJsonParser.Items_listaContext):
+        for listener in self.listeners:
+            listener.exitItems_lista(ctx)
+
+    def enterValor(self, ctx:NaturalToJsonParser.ValorContext):
+        for listener in self.listeners:
+            listener.enterValor(ctx)
+
+    def exitValor(self, ctx:NaturalToJsonParser.ValorContext):
+        for listener in self.listeners:
+            listener.exitValor(ctx)
+
+
+# Reglas para las que los listeners de análisis definen eventos enter*/exit*:
+# (índice de regla, nombre del método enter*, nombre del método exit*)
+_HOOKED_RULES = tuple(
+    (rule_index, "enter" + name, "exit" + name)
+    for rule_index, name in (
+        (NaturalToJsonParser.RULE_crear_objeto_cmd, "Crear_objeto_cmd"),
+        (NaturalToJsonParser.RULE_propiedad, "Propiedad"),
+        (NaturalToJsonParser.RULE_crear_lista_cmd, "Crear_lista_cmd"),
+        (NaturalToJsonParser.RULE_items_lista, "Items_lista"),
+        (NaturalToJsonParser.RULE_valor, "Valor"),
+    )
+)
+
+def walk_rules(listener, tree, tree_listener=None):
+    """
+    Recorre el árbol de parseo invocando en `listener` solo los eventos
+    enter*/exit* de las reglas listadas en `_HOOKED_RULES`.
+
+    Es una alternativa ligera a ParseTreeWalker para listeners que no usan
+    enterEveryRule/exitEveryRule ni visitTerminal: por cada nodo basta con
+    buscar su índice de regla en un diccionario, y los terminales se omiten.
+
+    Si se indica `tree_listener`, en el mismo recorrido recibe además los
+    eventos genéricos de todo el árbol (enterEveryRule, exitEveryRule,
+    visitTerminal, visitErrorNode), como con ParseTreeWalker. Así listeners
+    como `ParseTreeModelBuilder` no necesitan un recorrido aparte.
+
+    Args:
+        listener (NaturalToJsonListener): Listener que recibe los eventos.
+        tree (ParserRuleContext): Raíz del árbol de parseo.
+        tree_listener (ParseTreeListener, opcional): Listener del recorrido completo.
+    """
+    hooks = {
+        rule_index: (getattr(listener, enter_name), getattr(listener, exit_name))
+        for rule_index, enter_name, exit_name in _HOOKED_RULES
+    }
+    rule_context = ParserRuleContext
+
+    def walk(ctx):
+        hook = hooks.get(ctx.getRuleIndex())
+        if hook is not None:
+            hook[0](ctx)
+        if ctx.children:
+            for child in ctx.children:
+                if isinstance(child, rule_context): # Los terminales no tienen eventos
+                    walk(child)
+        if hook is not None:
+            hook[1](ctx)
+
+    if tree_listener is None:
+        walk(tree)
+        return
+
+    enter_every_rule = tree_listener.enterEveryRule
+    exit_every_rule = tree_listener.exitEveryRule
+    visit_terminal = tree_listener.visitTerminal
+    visit_error_node = tree_listener.visitErrorNode
+    error_node = ErrorNode
+
+    def walk_full(ctx):
+        hook = hooks.get(ctx.getRuleIndex())
+        enter_every_rule(ctx)
+        if hook is not None:
+            hook[0](ctx)
+        if ctx.children:
+            for child in ctx.children:
+                if isinstance(child, rule_context):
+                    walk_full(child)
+                elif isinstance(child, error_node):
+                    visit_error_node(child)
+                else:
+                    visit_terminal(child)
+        if hook is not None:
+            hook[1](ctx)
+        exit_every_rule(ctx)
+
+    walk_full(tree)
+
+
+# ---  Listener para construir el árbol de parseo visual para QTreeView ---
 class ParseTreeModelBuilder(NaturalToJsonListener):
     """
-    Listener de ANTLR que construye un QStandardItemModel para ser utilizado
-    con un QTreeView en PyQt5. Este modelo representa la estructura jerárquica
-    del árbol de parseo.
+    Listener de ANTLR que construye un árbol ligero de tuplas `(texto, hijos)`
+    con la estructura jerárquica del árbol de parseo. Los nodos de regla tienen
+    una lista de hijos; los terminales tienen `None`.
+
+    No crea objetos de Qt durante el recorrido: el modelo para QTreeView
+    (`LazyParseTreeModel`) se crea sobre este árbol en `get_model()`.
     """
     def __init__(self, parser_rule_names):
         """
-        Inicializa el constructor del modelo del árbol de parseo.
+        Inicializa el constructor del árbol de parseo.
 
         Args:
-            parser_rule_names (list): Lista de nombres de las reglas del parser,
-                                      obtenida de `NaturalToJsonParser.ruleNames`.
+            parser_rule_names (list|tuple): Nombres de las reglas del parser,
+                                            ej. `_RULE_NAMES` (de `NaturalToJsonParser.ruleNames`).
         """
         super().__init__()
-        self.model = QStandardItemModel()
         self.parser_rule_names = parser_rule_names
-        self.item_stack = []  # Pila para mantener el QStandardItem padre actual
+        self.root = []  # Nodos raíz del árbol
+        self.stack = [self.root]  # Pila con la lista de hijos del nodo de regla actual
+        # Constantes consultadas por cada terminal, resueltas una sola vez
+        self._token_names = NaturalToJsonLexer.symbolicNames
+        self._eof = Token.EOF
+        self._default_channel = Token.DEFAULT_CHANNEL
 
     def get_model(self):
         """
-        Retorna el QStandardItemModel construido.
+        Retorna el modelo del árbol de parseo construido.
 
         Returns:
-            QStandardItemModel: El modelo del árbol de parseo para QTreeView.
+            LazyParseTreeModel: El modelo del árbol de parseo para QTreeView.
         """
-        return self.model
+        return LazyParseTreeModel(self.root)
 
     def enterEveryRule(self, ctx:ParserRuleContext):
         """
         Invocado al entrar en cualquier regla del parser.
 
-        Crea un nuevo QStandardItem para esta regla y lo añade al modelo,
-        ya sea como un nodo raíz o como hijo del item actual en la cima
-        de `item_stack`. Luego, empuja el nuevo item a la pila.
+        Crea un nodo para esta regla, lo añade como hijo del nodo en la cima
+        de `stack` y empuja su lista de hijos a la pila.
         """
-        # Obtener el nombre de la regla
-        rule_name_index = ctx.getRuleIndex()
-        rule_name = self.parser_rule_names[rule_name_index]
-        
-        item_text = f"{rule_name}"
-        current_item = QStandardItem(item_text)
-        current_item.setEditable(False)  # Los nodos del árbol no deben ser editables por el usuario
-
-        if not self.item_stack: # Si la pila está vacía, es un nodo raíz
-            self.model.appendRow(current_item)
-        else: # Añadir como hijo del item en el tope de la pila
-            self.item_stack[-1].appendRow(current_item)
-        
-        self.item_stack.append(current_item)  # Empujar el item actual a la pila
+        node = (self.parser_rule_names[ctx.getRuleIndex()], [])
+        self.stack[-1].append(node)
+        self.stack.append(node[1])
 
     def exitEveryRule(self, ctx:ParserRuleContext):
         """
         Invocado al salir de cualquier regla del parser.
 
-        Saca el item correspondiente de la pila `item_stack` para
+        Saca la lista de hijos de la regla de la pila `stack` para
         retroceder en la jerarquía del árbol.
         """
-        if self.item_stack:
-            self.item_stack.pop()
+        if len(self.stack) > 1:
+            self.stack.pop()
 
     def visitTerminal(self, node:TerminalNode):
         """
         Invocado al visitar un nodo terminal (un token) en el árbol de parseo.
 
-        Crea un QStandardItem para el token y lo añade como hijo del
-        item de regla actual en la cima de `item_stack`.
+        Añade un nodo hoja para el token como hijo del nodo de regla actual.
         Se omiten los tokens EOF y los del canal oculto (ej. comentarios, espacios).
         """
-        if self.item_stack: # Solo añadir terminales si hay un item padre en la pila
+        stack = self.stack
+        if len(stack) > 1: # Solo añadir terminales si hay un nodo de regla padre
             token = node.getSymbol()
             # No mostrar EOF o tokens de canal oculto en el árbol visual
-            if token.type != Token.EOF and token.channel == Token.DEFAULT_CHANNEL:
-                token_name = NaturalToJsonLexer.symbolicNames[token.type]
-                terminal_text = f"{token_name}: '{node.getText()}'"
-                terminal_item = QStandardItem(terminal_text)
-                terminal_item.setEditable(False)
-                # Opcional: Colorear los terminales de forma diferente para distinguirlos
-                # terminal_item.setForeground(QColor("blue")) 
-                self.item_stack[-1].appendRow(terminal_item)
-
-# --- Funciones de Análisis (Modificada para devolver el QStandardItemModel) ---
+            if token.type != self._eof and token.channel == self._default_channel:
+                token_name = self._token_names[token.type]
+                stack[-1].append((f"{token_name}: '{token.text}'", None))
+
+class LazyParseTreeModel(QAbstractItemModel):
+    """
+    Modelo de solo lectura para QTreeView sobre el árbol de tuplas
+    `(texto, hijos)` construido por `ParseTreeModelBuilder`.
+
+    Los índices de Qt se crean bajo demanda, solo para las filas que la
+    vista solicita, en lugar de crear un QStandardItem por cada nodo.
+    """
+    def __init__(self, root_nodes, parent=None):
+        super().__init__(parent)
+        self._root = (None, root_nodes)
+        # Relaciones registradas al crear índices: id(nodo) -> nodo padre / fila
+        self._parents = {}
+        self._rows = {}
+
+    def _node(self, index):
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index(self, row, column, parent=QModelIndex()):
+        if column != 0 or row < 0:
+            return QModelIndex()
+        parent_node = self._node(parent)
+        children = parent_node[1]
+        if not children or row >= len(children):
+            return QModelIndex()
+        child = children[row]
+        self._parents[id(child)] = parent_node
+        self._rows[id(child)] = row
+        return self.createIndex(row, 0, child)
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        parent_node = self._parents.get(id(index.internalPointer()), self._root)
+        if parent_node is self._root:
+            return QModelIndex()
+        return self.createIndex(self._rows[id(parent_node)], 0, parent_node)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        children = self._node(parent)[1]
+        return len(children) if children else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return index.internalPointer()[0]
+        return None
+
+    def flags(self, index):
+        # Los nodos del árbol no deben ser editables por el usuario
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+# --- Funciones de Análisis ---
+# Formato de cada línea de la lista de tokens
+_TOKEN_LINE_FORMAT = "  ● Token #%d: Tipo=%s Texto='%s' (L:%d, C:%d)"
+# A partir de este número de tokens la lista se escribe en un io.StringIO
+# en lugar de acumular todas las líneas en una lista antes de unirlas.
+_TOKEN_STREAMING_THRESHOLD = 10000
+# A partir de cuántos comandos el JSON se serializa por fragmentos sin diccionario intermedio
+_JSON_STREAMING_THRESHOLD = 10000
+
+def _visible_tokens(tokens):
+    """
+    Filtra los tokens que llegan al parser: los del canal por defecto, sin EOF
+    (se omiten comentarios y espacios).
+    """
+    default_channel, eof = Token.DEFAULT_CHANNEL, Token.EOF
+    return [t for t in tokens if t.channel == default_channel and t.type != eof]
+
+def format_tokens(tokens):
+    """
+    Formatea una lista de tokens de ANTLR como texto legible.
+
+    Solo se incluyen los tokens del canal por defecto (se omiten EOF, comentarios
+    y espacios), por lo que sirve tanto para la salida de `getAllTokens()` como
+    para los tokens de un `CommonTokenStream` ya llenado.
+
+    Args:
+        tokens (list): Lista de tokens de ANTLR.
+
+    Returns:
+        str: Una cadena multilínea formateada con la lista de tokens.
+    """
+    return _format_visible_tokens(_visible_tokens(tokens))
+
+def _token_listing_lines(visible_tokens):
+    """
+    Genera las líneas (sin salto final) de la lista de tokens: encabezado, una
+    línea por token y pie. Compartido por las dos formas de unirlas en
+    `_format_visible_tokens`, para que produzcan el mismo texto.
+    """
+    names = NaturalToJsonLexer.symbolicNames
+    yield "--- Tokens Reconocidos por el Analizador Léxico ---"
+    for i, t in enumerate(visible_tokens):
+        yield _TOKEN_LINE_FORMAT % (i, names[t.type].ljust(18), t.text, t.line, t.column + 1)
+    if not visible_tokens:
+        yield "  No se reconocieron tokens del canal por defecto."
+    yield "-------------------------------------------------"
+
+def _format_visible_tokens(visible_tokens):
+    """
+    Formatea tokens ya filtrados con `_visible_tokens` (ver `format_tokens`).
+    """
+    lines = _token_listing_lines(visible_tokens)
+    if len(visible_tokens) > _TOKEN_STREAMING_THRESHOLD:
+        # Entradas muy grandes: se escribe en un único búfer sin lista intermedia de líneas
+        buffer = io.StringIO()
+        for line in lines:
+            buffer.write(line)
+            buffer.write("\n")
+        return buffer.getvalue()
+    return "\n".join(lines) + "\n"
+
 def get_tokens_as_string(input_content_string):
     """
     Realiza un análisis léxico de la cadena de entrada y devuelve una
@@ -657,21 +1070,28 @@ def get_tokens_as_string(input_content_string):
     Returns:
         str: Una cadena multilínea formateada con la lista de tokens.
     """
-    output_lines = ["--- Tokens Reconocidos por el Analizador Léxico ---"]
-    lexer_instance = NaturalToJsonLexer(InputStream(input_content_string))    
-    token_count = 0
-    for token in lexer_instance.getAllTokens():
-        if token.channel == Token.DEFAULT_CHANNEL:
-            token_type_name = NaturalToJsonLexer.symbolicNames[token.type]
-            output_lines.append(f"  ● Token #{token_count}: Tipo={token_type_name:<18} Texto='{token.text}' (L:{token.line}, C:{token.column+1})")
-            token_count += 1
-    if token_count == 0:
-        output_lines.append("  No se reconocieron tokens del canal por defecto.")
-    output_lines.append("-------------------------------------------------\n")
-    return "\n".join(output_lines)
+    lexer_instance = NaturalToJsonLexer(InputStream(input_content_string))
+    return format_tokens(lexer_instance.getAllTokens())
 
 
-def analyze_and_transform(source_name, input_content):
+# Lexer y parser reutilizables, uno por hilo: así no se reconstruyen sus
+# simuladores ATN (y la caché de contextos del lexer) en cada análisis.
+_RECOGNIZERS = threading.local()
+
+def _get_recognizers():
+    """
+    Retorna el par (lexer, parser) del hilo actual, creándolo la primera vez.
+    El llamador debe asignarles la nueva entrada (`lexer.inputStream = ...`,
+    `parser.setTokenStream(...)`), lo que también reinicia su estado interno.
+    """
+    recognizers = getattr(_RECOGNIZERS, "pair", None)
+    if recognizers is None:
+        recognizers = (NaturalToJsonLexer(), NaturalToJsonParser(None))
+        _RECOGNIZERS.pair = recognizers
+    return recognizers
+
+def analyze_and_transform(source_name, input_content, *, build_qt_model=True, build_lisp=True, build_ir=True,
+                          build_tokens=True):
     """
     Función principal que orquesta el proceso de análisis y transformación.
 
@@ -682,24 +1102,34 @@ def analyze_and_transform(source_name, input_content):
     Args:
         source_name (str): Nombre identificador de la fuente de entrada (ej. nombre de archivo).
         input_content (str): La cadena de texto con los comandos a analizar.
+        build_qt_model (bool, optional): Si es False no se construye el modelo del
+                                         árbol para QTreeView (ej. CLI o tests).
+                                         Defaults to True.
+        build_lisp (bool, optional): Si es False no se genera la representación
+                                     LISP del árbol. Defaults to True.
+        build_ir (bool, optional): Si es False no se construye ni optimiza la IR
+                                   (`stats["ir"]` será None). Defaults to True.
+        build_tokens (bool, optional): Si es False no se formatea la lista textual
+                                       de tokens. Defaults to True.
 
     Returns:
         tuple: Una tupla con 6 elementos:
             - json_output_string (str|None): Cadena JSON generada, o None si hay errores.
-            - tokens_string_output (str): Representación textual de los tokens.
+            - tokens_string_output (str|None): Representación textual de los tokens,
+                                               o None si no se solicitó.
             - parsetree_lisp_string_output (str|None): Representación textual del árbol de parseo
-                                                       en formato LISP, o None si no se pudo generar.
-            - parsetree_qt_model (QStandardItemModel|None): Modelo del árbol de parseo para QTreeView,
-                                                            o None si hay errores.
+                                                       en formato LISP, o None si no se pudo generar
+                                                       o no se solicitó.
+            - parsetree_qt_model (LazyParseTreeModel|None): Modelo del árbol de parseo para QTreeView,
+                                                            o None si hay errores o no se solicitó.
             - error_summary_output (str): Resumen de errores formateado.
             - stats (dict): Diccionario con estadísticas del análisis.
     """
     start_time = time.time()
-    tokens_string_output = get_tokens_as_string(input_content)
 
-    # Configuración del Lexer
-    input_stream = InputStream(input_content)
-    lexer = NaturalToJsonLexer(input_stream)
+    # Configuración del Lexer (reutilizado entre llamadas; asignar la entrada lo reinicia)
+    lexer, parser = _get_recognizers()
+    lexer.inputStream = InputStream(input_content)
     error_listener = CustomErrorListener(source_name)
     lexer.removeErrorListeners()
     lexer.addErrorListener(error_listener)
@@ -711,58 +1141,76 @@ def analyze_and_transform(source_name, input_content):
     except Exception as e:
         # Captura errores muy tempranos en la tokenización que podrían no ser manejados por el listener
         error_listener.error_messages.append(f"Error crítico durante la tokenización inicial: {e}")
+    # Los mismos tokens que recibe el parser se usan para la lista textual (un solo análisis léxico);
+    # el mismo filtrado sirve también para la estadística de tokens al parser
+    visible_tokens = _visible_tokens(token_stream.tokens)
+    tokens_string_output = _format_visible_tokens(visible_tokens) if build_tokens else None
 
-    parser = NaturalToJsonParser(token_stream)
+    parser.setTokenStream(token_stream) # Reinicia el estado del parser reutilizado
     parser.removeErrorListeners()
     parser.addErrorListener(error_listener)
 
-    tree = parser.programa() # Ejecuta el parser y obtiene el árbol de parseo (AST)
+    # Ejecuta el parser y obtiene el árbol de parseo (AST). Es el único parseo de la
+    # entrada: el mismo árbol se reutiliza para el análisis, la IR, el JSON y las vistas.
+    tree = parser.programa()
+    child_count = tree.getChildCount() # Comandos + EOF; se consulta varias veces abajo
 
     parsetree_qt_model = None # Modelo para QTreeView
     parsetree_lisp_string_output = None # Para LISP style tree
     json_output_string = None
     num_comandos = 0
-    symbols_debug_info = {} # Información de depuración de la tabla de símbolos
-    ir_output = [] # Representación Intermedia
+    symbols_debug_info = SymbolTable().debug_view() # Depuración de la tabla de símbolos (vacía si hay errores de sintaxis)
+    ir_output = [] if build_ir else None # Representación Intermedia
     
     # 1. Verificar errores léxicos y sintácticos
     if error_listener.get_total_errors() == 0 and tree:
-        # 2. Análisis Semántico
+        # 2. Análisis Semántico, Generación de IR (Unidad 2) y construcción del JSON
+        # en un único recorrido del árbol. La IR y el JSON solo se usan si no hubo
+        # errores semánticos.
         symbol_table = SymbolTable()
         semantic_analyzer = SemanticAnalyzer(error_listener, symbol_table)
-        walker = ParseTreeWalker()
-        walker.walk(semantic_analyzer, tree)
+        ir_builder = IRBuilderListener() if build_ir else None
+        # orjson o json se elige una sola vez para todo el documento, a partir de sus
+        # literales numéricos, y vale igual para el modo normal y el modo stream
+        use_orjson = orjson is not None and _orjson_can_serialize_tokens(visible_tokens)
+        # Con muchos comandos se evita el diccionario intermedio (hijos de 'programa' menos EOF)
+        json_builder = JsonBuilderListener(
+            stream=child_count - 1 > _JSON_STREAMING_THRESHOLD, use_orjson=use_orjson)
+        analysis_listeners = [semantic_analyzer, json_builder]
+        if build_ir:
+            analysis_listeners.insert(1, ir_builder)
+        fused_listener = FusedListener(*analysis_listeners)
+        if build_qt_model:
+            # El modelo del árbol necesita el recorrido completo (terminales incluidos):
+            # se construye en el mismo recorrido y solo se usa si no hay errores semánticos.
+            model_builder = ParseTreeModelBuilder(_RULE_NAMES)
+            walk_rules(fused_listener, tree, tree_listener=model_builder)
+        else:
+            walk_rules(fused_listener, tree)
 
-        # Capturar información de depuración de la tabla de símbolos
-        symbols_debug_info = symbol_table.get_debug_info()
+        # Información de depuración de la tabla de símbolos (vista perezosa, sin copiarla)
+        symbols_debug_info = symbol_table.debug_view()
 
-        # 3. Generación de IR (Unidad 2) + Optimización (Unidad 4)
+        # 3. IR + Optimización (Unidad 4), JSON y estructuras del árbol (solo si no hay errores semánticos)
         if error_listener.semantic_errors == 0:
-            ir_builder = IRBuilderListener()
-            walker.walk(ir_builder, tree)
-            ir_output = ir_builder.get_instructions()
-            # Aplicar optimización de IR (Unidad 4)
-            ir_output = optimize_ir(ir_output)
+            if build_ir:
+                # Aplicar optimización de IR (Unidad 4)
+                ir_output = optimize_ir(ir_builder.get_instructions())
 
-        # 4. Generación de JSON y estructuras del árbol (solo si no hay errores semánticos)
-        if error_listener.semantic_errors == 0:
-            # Construir el modelo para QTreeView
-            model_builder = ParseTreeModelBuilder(list(NaturalToJsonParser.ruleNames))
-            walker.walk(model_builder, tree)
-            parsetree_qt_model = model_builder.get_model()
+            # Modelo para QTreeView (solo si se solicitó)
+            if build_qt_model:
+                parsetree_qt_model = model_builder.get_model()
             
-            # Construir JSON
-            json_builder = JsonBuilderListener()
-            walker.walk(json_builder, tree) # Reutilizar el ParseTreeWalker
+            # Serializar JSON
             json_output_string = json_builder.get_final_json_string()
-            num_comandos = len(json_builder.result_data)
+            num_comandos = json_builder.get_command_count()
 
-            # Generar representación textual del árbol (estilo LISP)
+            # Generar representación textual del árbol (estilo LISP), solo si se solicitó
             try:
-                rule_names_list = list(NaturalToJsonParser.ruleNames)
-                parsetree_lisp_s = Trees.toStringTree(tree, recog=parser, rule_names=rule_names_list)
                 # Only create a meaningful string if the tree has actual content beyond just EOF
-                if tree.getChildCount() > 1 or (tree.getChildCount() == 1 and tree.getChild(0).getSymbol().type != Token.EOF):
+                # (se verifica antes de serializar para no recorrer el árbol en vano)
+                if build_lisp and (child_count > 1 or (child_count == 1 and tree.getChild(0).getSymbol().type != Token.EOF)):
+                    parsetree_lisp_s = Trees.toStringTree(tree, ruleNames=_RULE_NAMES, recog=parser)
                     parsetree_lisp_string_output = (
                         "--- Árbol de Parseo (Estilo LISP) ---\n"
                         f"{parsetree_lisp_s}\n"
@@ -777,8 +1225,8 @@ def analyze_and_transform(source_name, input_content):
     error_summary_output = error_listener.get_error_summary_string()
     end_time = time.time()
     analysis_time = end_time - start_time
-    # Contar tokens que realmente van al parser (excluyendo EOF y canal oculto)
-    parser_tokens_count = sum(1 for t in token_stream.tokens if t.channel == Token.DEFAULT_CHANNEL and t.type != Token.EOF)
+    # Tokens que realmente van al parser (excluyendo EOF y canal oculto), ya filtrados arriba
+    parser_tokens_count = len(visible_tokens)
 
     # Diccionario de estadísticas
     stats = {
@@ -793,3 +1241,40 @@ def analyze_and_transform(source_name, input_content):
     }
 
     return json_output_string, tokens_string_output, parsetree_lisp_string_output, parsetree_qt_model, error_summary_output, stats
+
+# Memo de `analyze_for_stats`: (source_name, sha1 del contenido) -> (json, stats).
+# Se guarda el resumen en vez del texto para no retener entradas grandes.
+_STATS_MEMO = {}
+_STATS_MEMO_MAXSIZE = 128
+
+def analyze_for_stats(source_name, input_content):
+    """
+    Variante de `analyze_and_transform` para quien solo necesita el JSON y las
+    estadísticas (ej. tests o procesamiento por lotes): no se formatea la lista
+    de tokens ni se construyen las vistas del árbol (LISP y modelo Qt).
+
+    El resultado se memoriza por proceso: el mismo par (nombre, contenido) se
+    analiza una sola vez. Cada llamada recibe una copia profunda de `stats`, así
+    que modificarla no afecta a las demás; el tiempo de análisis reportado es el
+    del primer análisis.
+
+    Args:
+        source_name (str): Nombre identificador de la fuente de entrada.
+        input_content (str): La cadena de texto con los comandos a analizar.
+
+    Returns:
+        tuple: (json_output_string, stats), con el mismo significado que en
+               `analyze_and_transform`.
+    """
+    key = (source_name, hashlib.sha1(input_content.encode("utf-8")).digest())
+    cached = _STATS_MEMO.get(key)
+    if cached is None:
+        json_output_string, _, _, _, _, stats = analyze_and_transform(
+            source_name, input_content, build_qt_model=False, build_lisp=False, build_tokens=False)
+        cached = (json_output_string, stats)
+        if len(_STATS_MEMO) >= _STATS_MEMO_MAXSIZE:
+            # Se descarta la entrada más antigua (orden de inserción del dict)
+            _STATS_MEMO.pop(next(iter(_STATS_MEMO)), None)
+        _STATS_MEMO[key] = cached
+    json_output_string, stats = cached
+    return json_output_string, copy.deepcopy(stats)
@@ -0,0 +1,27 @@
+"""
+Definiciones de la Representación Intermedia (IR).
+
+Cada instrucción es una tupla con nombre `(opcode, args)`: el acceso por
+atributo (`instr.opcode`, `instr.args`) es un índice de tupla, más barato y
+compacto que un diccionario por instrucción. Los opcodes son constantes de
+módulo, compartidas por el constructor de la IR, el optimizador y el
+generador de código.
+"""
+
+from collections import namedtuple
+
+# --- Opcodes ---
+IR_CREATE_OBJECT = "IR_CREATE_OBJECT"
+IR_SET_PROPERTY = "IR_SET_PROPERTY"
+IR_CREATE_LIST = "IR_CREATE_LIST"
+IR_APPEND_LIST = "IR_APPEND_LIST"
+
+class IRInstruction(namedtuple("IRInstruction", ("opcode", "args"))):
+    """
+    Representa una instrucción de la Representación Intermedia (IR).
+
+    Attributes:
+        opcode (str): Uno de los opcodes IR_* de este módulo.
+        args (list): Argumentos de la instrucción (ver docs/ir.md).
+    """
+    __slots__ = ()
@@ -128,7 +128,9 @@ def run_analysis_for_cli(source_name, content):
 
     # Llamada al motor de análisis. Devuelve 6 valores:
     # json_string, tokens_string, parsetree_lisp_string, parsetree_qt_model, error_summary_string, stats_dict
-    json_s, tokens_s, tree_lisp_s, _qt_model, errors_s, stats_data = analyze_and_transform(source_name, content)
+    # La CLI no muestra el árbol en un QTreeView ni la IR, así que no se construyen.
+    json_s, tokens_s, tree_lisp_s, _qt_model, errors_s, stats_data = analyze_and_transform(
+        source_name, content, build_qt_model=False, build_ir=False)
 
     # Mostrar siempre los tokens reconocidos
     print(tokens_s)
@@ -426,7 +426,9 @@ class NaturalToJsonApp(QMainWindow): # Cambiado a QMainWindow
         try:
             # Llamada al motor de análisis.
             # Devuelve: json_s, tokens_s, _parsetree_lisp, parsetree_qt_model, errors_s, stats
-            json_s, tokens_s, _parsetree_lisp, parsetree_qt_model, errors_s, stats = analyze_and_transform(source_name, input_content)
+            # La GUI no muestra la representación LISP ni la IR: no se generan
+            json_s, tokens_s, _parsetree_lisp, parsetree_qt_model, errors_s, stats = analyze_and_transform(
+                source_name, input_content, build_lisp=False, build_ir=False)
 
             # Mostrar tokens
             self.tokens_output_text.setPlainText(tokens_s)
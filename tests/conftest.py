@@ -0,0 +1,28 @@
+import sys
+import pathlib
+
+import pytest
+
+# Single place where src/ is added to sys.path for every test module: conftest is
+# imported before any test module is collected, and the path is added only once.
+_SRC = str((pathlib.Path(__file__).parent.parent / 'src').resolve())
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+
+# Small program touching every statement form, used only to warm the analyzer
+_WARMUP_INPUT = (
+    'CREAR OBJETO warmup CON texto:"a", numero:1, flag:VERDADERO\n'
+    'CREAR LISTA warmup_lista CON ELEMENTOS 1, "b", FALSO\n'
+)
+
+@pytest.fixture(scope='session', autouse=True)
+def _warm_analyzer():
+    """
+    Runs the analyzer once per session before the first test.
+
+    ANTLR deserializes the ATN when the generated lexer/parser modules are
+    imported and fills its prediction DFA (shared at class level) on the first
+    parses, so the first test no longer pays that cold-start cost.
+    """
+    from analyzer_core import analyze_and_transform
+    analyze_and_transform("warmup", _WARMUP_INPUT, build_qt_model=False, build_lisp=False)
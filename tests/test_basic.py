@@ -1,12 +1,9 @@
-import sys
 import os
 import unittest
 import json
 
-# Add src to sys.path to import analyzer_core
+# src/ is added to sys.path by tests/conftest.py
 current_dir = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(os.path.dirname(current_dir), 'src')
-sys.path.append(src_dir)
 
 from analyzer_core import analyze_and_transform
 
@@ -23,7 +20,7 @@ class TestAnalyzer(unittest.TestCase):
                     content = f.read()
                 
                 print(f"Testing valid file: {filename}")
-                json_out, _, _, _, errors, _ = analyze_and_transform(filename, content)
+                json_out, _, _, _, errors, _ = analyze_and_transform(filename, content, build_qt_model=False, build_lisp=False)
                 
                 self.assertFalse(errors, f"Valid file {filename} produced errors: {errors}")
                 self.assertIsNotNone(json_out, f"Valid file {filename} did not produce JSON")
@@ -49,6 +46,45 @@ class TestAnalyzer(unittest.TestCase):
                     except json.JSONDecodeError:
                         self.fail(f"Output for {filename} is not valid JSON")
 
+    def test_default_flags_build_all_outputs(self):
+        # Default flags: LISP string and Qt model are built (walk_rules with tree_listener)
+        content = 'CREAR OBJETO a CON x:1, y:"dos"\nCREAR LISTA l CON ELEMENTOS VERDADERO, 2.5'
+        json_out, tokens, lisp_tree, qt_model, errors, stats = analyze_and_transform("default_flags", content)
+
+        self.assertFalse(errors, f"Default-flags run produced errors: {errors}")
+        self.assertIsNotNone(json_out)
+        self.assertIsNotNone(tokens)
+        self.assertTrue(stats["ir"], "IR should be generated by default")
+        self.assertIsNotNone(lisp_tree, "LISP tree should be generated by default")
+        self.assertNotIn("Advertencia", lisp_tree)
+        lisp_body = lisp_tree.splitlines()[1]
+        self.assertTrue(lisp_body.startswith("(programa (comando (crear_objeto_cmd CREAR OBJETO a CON"), lisp_body)
+        self.assertIsNotNone(qt_model, "Qt model should be generated by default")
+        self.assertEqual(qt_model.rowCount(), 1) # 'programa'
+
+    def test_json_number_edge_cases(self):
+        # A decimal that overflows to inf must not be lost (orjson would write null)
+        overflow = '9' * 400 + '.5'
+        content = f'CREAR OBJETO a CON x:{overflow}, y:0.00000000123, z:-0.00000000123'
+        json_out, _, _, _, errors, _ = analyze_and_transform("edge_numbers", content, build_qt_model=False, build_lisp=False)
+
+        self.assertFalse(errors, f"Edge-case numbers produced errors: {errors}")
+        self.assertIn('"x": Infinity', json_out)
+        data = json.loads(json_out)
+        self.assertEqual(data["a"]["x"], float("inf"))
+        self.assertEqual(data["a"]["y"], 1.23e-09)
+        self.assertEqual(data["a"]["z"], -1.23e-09)
+
+    def test_json_small_exponent_float(self):
+        # Without special values the float text may use either serializer's
+        # exponent form (1.23e-9 or 1.23e-09); the value must be the same
+        content = 'CREAR OBJETO a CON y:0.00000000123, z:-0.00000000123'
+        json_out, _, _, _, errors, _ = analyze_and_transform("small_floats", content, build_qt_model=False, build_lisp=False)
+
+        self.assertFalse(errors, f"Small floats produced errors: {errors}")
+        self.assertRegex(json_out, r'"y": 1\.23e-0?9')
+        self.assertEqual(json.loads(json_out), {"a": {"y": 1.23e-09, "z": -1.23e-09}})
+
     def test_invalid_examples(self):
         invalid_dir = os.path.join(self.examples_dir, 'invalid')
         for filename in os.listdir(invalid_dir):
@@ -58,9 +94,6 @@ class TestAnalyzer(unittest.TestCase):
                     content = f.read()
                 
                 print(f"Testing invalid file: {filename}")
-                _, _, _, _, errors, _ = analyze_and_transform(filename, content)
+                _, _, _, _, errors, _ = analyze_and_transform(filename, content, build_qt_model=False, build_lisp=False)
                 
                 self.assertTrue(errors, f"Invalid file {filename} should have produced errors but didn't")
-
-if __name__ == '__main__':
-    unittest.main()
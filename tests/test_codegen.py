@@ -1,26 +1,20 @@
-import sys
-import os
 import json
 import pytest
 
-# Add src to sys.path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(os.path.dirname(current_dir), 'src')
-sys.path.append(src_dir)
-
 from analyzer_core import analyze_and_transform
-from codegen import generate_python_from_ir
+from codegen import generate_python_from_ir, compile_ir, iter_python_lines
+from ir import IRInstruction
 
 def test_codegen_object():
     input_text = 'CREAR OBJETO usuario CON nombre:"Juan", edad:30, activo:VERDADERO'
 
-    json_out, _, _, _, _, stats = analyze_and_transform("test_codegen_obj", input_text)
+    json_out, _, _, _, _, stats = analyze_and_transform("test_codegen_obj", input_text, build_qt_model=False, build_lisp=False)
     assert json_out is not None
 
     ir = stats.get("ir", [])
     assert ir, "IR should not be empty"
 
-    code = generate_python_from_ir(ir)
+    code = compile_ir(ir)
 
     env = {}
     exec(code, {}, env)  # Ejecutar código generado en entorno aislado
@@ -33,11 +27,11 @@ def test_codegen_object():
 def test_codegen_list():
     input_text = 'CREAR LISTA numeros CON ELEMENTOS 1, 2, 3'
 
-    json_out, _, _, _, _, stats = analyze_and_transform("test_codegen_list", input_text)
+    json_out, _, _, _, _, stats = analyze_and_transform("test_codegen_list", input_text, build_qt_model=False, build_lisp=False)
     assert json_out is not None
 
     ir = stats.get("ir", [])
-    code = generate_python_from_ir(ir)
+    code = compile_ir(ir)
 
     env = {}
     exec(code, {}, env)
@@ -52,11 +46,11 @@ def test_codegen_mixed():
     CREAR LISTA ips CON ELEMENTOS "192.168.1.1", "127.0.0.1"
     '''
     
-    json_out, _, _, _, _, stats = analyze_and_transform("test_codegen_mixed", input_text)
+    json_out, _, _, _, _, stats = analyze_and_transform("test_codegen_mixed", input_text, build_qt_model=False, build_lisp=False)
     assert json_out is not None
     
     ir = stats.get("ir", [])
-    code = generate_python_from_ir(ir)
+    code = compile_ir(ir)
     
     env = {}
     exec(code, {}, env)
@@ -73,8 +67,8 @@ def test_codegen_string_escaping():
     # Test para asegurar que las comillas se escapan correctamente
     # Construimos IR manualmente porque el parser actual no soporta escapes en strings
     ir = [
-        {"opcode": "IR_CREATE_OBJECT", "args": ["mensaje"]},
-        {"opcode": "IR_SET_PROPERTY", "args": ["mensaje", "texto", "STRING", 'Hola "Mundo"']}
+        IRInstruction("IR_CREATE_OBJECT", ["mensaje"]),
+        IRInstruction("IR_SET_PROPERTY", ["mensaje", "texto", "STRING", 'Hola "Mundo"'])
     ]
     
     code = generate_python_from_ir(ir)
@@ -84,3 +78,51 @@ def test_codegen_string_escaping():
     
     assert "mensaje" in env
     assert env["mensaje"]["texto"] == 'Hola "Mundo"'
+
+def test_compile_ir_reusable():
+    # El objeto compilado se puede ejecutar varias veces, cada una en un entorno nuevo
+    ir = [
+        IRInstruction("IR_CREATE_LIST", ["valores"]),
+        IRInstruction("IR_APPEND_LIST", ["valores", "NUMBER", 1]),
+        IRInstruction("IR_APPEND_LIST", ["valores", "BOOLEAN", True])
+    ]
+
+    code = compile_ir(ir)
+
+    for _ in range(2):
+        env = {}
+        exec(code, {}, env)
+        assert env["valores"] == [1, True]
+
+def test_iter_python_lines_matches_string():
+    # El generador produce exactamente las líneas del código completo
+    ir = [
+        IRInstruction("IR_CREATE_OBJECT", ["p"]),
+        IRInstruction("IR_SET_PROPERTY", ["p", "x", "NUMBER", 10]),
+        IRInstruction("IR_CREATE_LIST", ["l"]),
+        IRInstruction("IR_APPEND_LIST", ["l", "STRING", "a"])
+    ]
+
+    lines = list(iter_python_lines(ir))
+
+    assert lines[0] == "# --- Codigo Generado ---"
+    assert "\n".join(lines) == generate_python_from_ir(ir)
+
+def test_codegen_emits_literals_for_grouped_entities():
+    # Una creación seguida solo de sus operaciones se emite como un único literal
+    ir = [
+        IRInstruction("IR_CREATE_OBJECT", ["p"]),
+        IRInstruction("IR_SET_PROPERTY", ["p", "x", "NUMBER", 10]),
+        IRInstruction("IR_SET_PROPERTY", ["p", "ok", "BOOLEAN", True]),
+        IRInstruction("IR_CREATE_LIST", ["l"]),
+        IRInstruction("IR_APPEND_LIST", ["l", "STRING", "a"]),
+        IRInstruction("IR_APPEND_LIST", ["p_otro", "NUMBER", 1]) # Operación suelta: sentencia
+    ]
+
+    lines = list(iter_python_lines(ir))
+
+    assert lines[1:] == [
+        'p = {"x": 10, "ok": True}',
+        "l = ['a']",
+        "p_otro.append(1)"
+    ]
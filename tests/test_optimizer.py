@@ -1,13 +1,10 @@
 
 import unittest
-import sys
-import os
 import json
-
-# Add src to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+import copy
 
 from optimizer import optimize_ir
+from ir import IRInstruction
 from codegen import generate_python_from_ir
 from analyzer_core import analyze_and_transform
 
@@ -22,39 +19,58 @@ class TestOptimizer(unittest.TestCase):
     def test_identity_no_optimization(self):
         """Test que una IR sin redundancias ni desorden se mantiene igual."""
         ir = [
-            {"opcode": "IR_CREATE_OBJECT", "args": ["obj1"]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["obj1", "prop1", "NUMBER", 1]},
-            {"opcode": "IR_CREATE_LIST", "args": ["list1"]},
-            {"opcode": "IR_APPEND_LIST", "args": ["list1", "STRING", "val1"]}
+            IRInstruction("IR_CREATE_OBJECT", ["obj1"]),
+            IRInstruction("IR_SET_PROPERTY", ["obj1", "prop1", "NUMBER", 1]),
+            IRInstruction("IR_CREATE_LIST", ["list1"]),
+            IRInstruction("IR_APPEND_LIST", ["list1", "STRING", "val1"])
         ]
         optimized = optimize_ir(ir)
         self.assertEqual(optimized, ir)
+        self.assertIsNot(optimized, ir) # Siempre una NUEVA lista, también en el camino rápido
         
     def test_redundancy_elimination(self):
         """Test que elimina asignaciones redundantes (mismo objeto, misma clave)."""
         ir = [
-            {"opcode": "IR_CREATE_OBJECT", "args": ["user"]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["user", "name", "STRING", "Juan"]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["user", "name", "STRING", "Pedro"]} # Sobrescribe
+            IRInstruction("IR_CREATE_OBJECT", ["user"]),
+            IRInstruction("IR_SET_PROPERTY", ["user", "name", "STRING", "Juan"]),
+            IRInstruction("IR_SET_PROPERTY", ["user", "name", "STRING", "Pedro"]) # Sobrescribe
         ]
         
         optimized = optimize_ir(ir)
         
         # Debería quedar solo la creación y la última asignación
         expected = [
-            {"opcode": "IR_CREATE_OBJECT", "args": ["user"]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["user", "name", "STRING", "Pedro"]}
+            IRInstruction("IR_CREATE_OBJECT", ["user"]),
+            IRInstruction("IR_SET_PROPERTY", ["user", "name", "STRING", "Pedro"])
         ]
         self.assertEqual(optimized, expected)
         
+    def test_redundancy_keeps_first_position(self):
+        """Test que la asignación que sobrevive ocupa la posición de la primera (mismo orden de claves que el JSON)."""
+        ir = [
+            IRInstruction("IR_CREATE_OBJECT", ["cfg"]),
+            IRInstruction("IR_SET_PROPERTY", ["cfg", "x", "NUMBER", 1]),
+            IRInstruction("IR_SET_PROPERTY", ["cfg", "y", "STRING", "b"]),
+            IRInstruction("IR_SET_PROPERTY", ["cfg", "x", "NUMBER", 3])
+        ]
+
+        optimized = optimize_ir(ir)
+
+        expected = [
+            IRInstruction("IR_CREATE_OBJECT", ["cfg"]),
+            IRInstruction("IR_SET_PROPERTY", ["cfg", "x", "NUMBER", 3]),
+            IRInstruction("IR_SET_PROPERTY", ["cfg", "y", "STRING", "b"])
+        ]
+        self.assertEqual(optimized, expected)
+
     def test_grouping_interleaved(self):
         """Test que agrupa instrucciones intercaladas de diferentes objetos."""
         ir = [
-            {"opcode": "IR_CREATE_OBJECT", "args": ["A"]},
-            {"opcode": "IR_CREATE_OBJECT", "args": ["B"]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["A", "x", "NUMBER", 1]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["B", "y", "NUMBER", 2]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["A", "z", "NUMBER", 3]}
+            IRInstruction("IR_CREATE_OBJECT", ["A"]),
+            IRInstruction("IR_CREATE_OBJECT", ["B"]),
+            IRInstruction("IR_SET_PROPERTY", ["A", "x", "NUMBER", 1]),
+            IRInstruction("IR_SET_PROPERTY", ["B", "y", "NUMBER", 2]),
+            IRInstruction("IR_SET_PROPERTY", ["A", "z", "NUMBER", 3])
         ]
         
         optimized = optimize_ir(ir)
@@ -62,11 +78,11 @@ class TestOptimizer(unittest.TestCase):
         # Esperamos: Crear A, props de A, Crear B, props de B
         # Nota: El orden relativo de props de A se debe mantener (x antes que z)
         expected = [
-            {"opcode": "IR_CREATE_OBJECT", "args": ["A"]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["A", "x", "NUMBER", 1]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["A", "z", "NUMBER", 3]},
-            {"opcode": "IR_CREATE_OBJECT", "args": ["B"]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["B", "y", "NUMBER", 2]}
+            IRInstruction("IR_CREATE_OBJECT", ["A"]),
+            IRInstruction("IR_SET_PROPERTY", ["A", "x", "NUMBER", 1]),
+            IRInstruction("IR_SET_PROPERTY", ["A", "z", "NUMBER", 3]),
+            IRInstruction("IR_CREATE_OBJECT", ["B"]),
+            IRInstruction("IR_SET_PROPERTY", ["B", "y", "NUMBER", 2])
         ]
         self.assertEqual(optimized, expected)
         
@@ -77,12 +93,12 @@ class TestOptimizer(unittest.TestCase):
         """
         # Caso con redundancia y desorden
         ir = [
-            {"opcode": "IR_CREATE_OBJECT", "args": ["data"]},
-            {"opcode": "IR_CREATE_LIST", "args": ["items"]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["data", "val", "NUMBER", 10]},
-            {"opcode": "IR_SET_PROPERTY", "args": ["data", "val", "NUMBER", 20]}, # Redundante
-            {"opcode": "IR_APPEND_LIST", "args": ["items", "NUMBER", 1]},
-            {"opcode": "IR_APPEND_LIST", "args": ["items", "NUMBER", 2]}
+            IRInstruction("IR_CREATE_OBJECT", ["data"]),
+            IRInstruction("IR_CREATE_LIST", ["items"]),
+            IRInstruction("IR_SET_PROPERTY", ["data", "val", "NUMBER", 10]),
+            IRInstruction("IR_SET_PROPERTY", ["data", "val", "NUMBER", 20]), # Redundante
+            IRInstruction("IR_APPEND_LIST", ["items", "NUMBER", 1]),
+            IRInstruction("IR_APPEND_LIST", ["items", "NUMBER", 2])
         ]
         
         optimized = optimize_ir(ir)
@@ -100,10 +116,27 @@ class TestOptimizer(unittest.TestCase):
         
     def test_no_mutation(self):
         """Asegura que la lista original no se modifica."""
-        ir = [{"opcode": "IR_CREATE_OBJECT", "args": ["test"]}]
+        ir = [IRInstruction("IR_CREATE_OBJECT", ["test"])]
         ir_copy = list(ir)
         optimize_ir(ir)
         self.assertEqual(ir, ir_copy)
 
-if __name__ == '__main__':
-    unittest.main()
+    def test_no_mutation_of_instructions(self):
+        """
+        Asegura que ni la lista ni las instrucciones (incluidos sus args) se modifican,
+        aunque se eliminen redundancias y se reordene: el optimizador no copia la IR.
+        """
+        ir = [
+            IRInstruction("IR_CREATE_OBJECT", ["A"]),
+            IRInstruction("IR_CREATE_LIST", ["L"]),
+            IRInstruction("IR_SET_PROPERTY", ["A", "x", "NUMBER", 1]),
+            IRInstruction("IR_APPEND_LIST", ["L", "STRING", "v"]),
+            IRInstruction("IR_SET_PROPERTY", ["A", "x", "NUMBER", 2])
+        ]
+        snapshot = copy.deepcopy(ir)
+        identities = [id(instr) for instr in ir]
+
+        optimize_ir(ir)
+
+        self.assertEqual(ir, snapshot)
+        self.assertEqual([id(instr) for instr in ir], identities)
@@ -0,0 +1,90 @@
+import os
+
+# The model needs no display; keep Qt headless when run outside the GUI
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt5.QtCore import QCoreApplication, QModelIndex, qInstallMessageHandler
+from PyQt5.QtTest import QAbstractItemModelTester
+
+from analyzer_core import analyze_and_transform
+
+INPUT_TEXT = 'CREAR OBJETO a CON x:1\nCREAR LISTA l CON ELEMENTOS 2, "b"'
+
+# Expected tree as (label, children); terminals have no children
+EXPECTED_TREE = [
+    ("programa", [
+        ("comando", [
+            ("crear_objeto_cmd", [
+                ("CREAR: 'CREAR'", []),
+                ("OBJETO: 'OBJETO'", []),
+                ("IDENTIFICADOR: 'a'", []),
+                ("CON: 'CON'", []),
+                ("propiedades", [
+                    ("propiedad", [
+                        ("IDENTIFICADOR: 'x'", []),
+                        ("DOS_PUNTOS: ':'", []),
+                        ("valor", [("NUMERO_ENTERO: '1'", [])]),
+                    ]),
+                ]),
+            ]),
+        ]),
+        ("comando", [
+            ("crear_lista_cmd", [
+                ("CREAR: 'CREAR'", []),
+                ("LISTA: 'LISTA'", []),
+                ("IDENTIFICADOR: 'l'", []),
+                ("CON: 'CON'", []),
+                ("ELEMENTOS: 'ELEMENTOS'", []),
+                ("items_lista", [
+                    ("valor", [("NUMERO_ENTERO: '2'", [])]),
+                    ("COMA: ','", []),
+                    ("valor", [("STRING: '\"b\"'", [])]),
+                ]),
+            ]),
+        ]),
+    ]),
+]
+
+@pytest.fixture(scope='module')
+def model():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    _, _, _, qt_model, errors, _ = analyze_and_transform("test_model", INPUT_TEXT, build_lisp=False)
+    assert not errors, errors
+    assert qt_model is not None
+    yield qt_model
+    del app
+
+def _walk(model, parent):
+    """Rebuilds the (label, children) tree through index()/data(), checking parent() on the way."""
+    nodes = []
+    for row in range(model.rowCount(parent)):
+        index = model.index(row, 0, parent)
+        assert index.isValid()
+        assert index.row() == row
+        assert model.parent(index) == parent
+        nodes.append((model.data(index), _walk(model, index)))
+    return nodes
+
+def test_model_matches_parse_tree(model):
+    assert _walk(model, QModelIndex()) == EXPECTED_TREE
+
+def test_model_out_of_range_indexes_are_invalid(model):
+    root = QModelIndex()
+    assert not model.index(model.rowCount(root), 0, root).isValid()
+    assert not model.index(0, 1, root).isValid()
+    assert not model.index(-1, 0, root).isValid()
+    assert not model.parent(root).isValid()
+
+def test_model_passes_qt_model_tester(model):
+    warnings = []
+    def handler(mode, context, message):
+        warnings.append(message)
+    previous = qInstallMessageHandler(handler)
+    try:
+        # Warning mode: violations are reported as Qt warnings instead of aborting
+        tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Warning)
+    finally:
+        qInstallMessageHandler(previous)
+    del tester
+    assert warnings == []
@@ -1,9 +1,5 @@
 import unittest
 import os
-import sys
-
-# Add src to path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from analyzer_core import analyze_and_transform
 
@@ -16,7 +12,7 @@ class TestSemanticAnalysis(unittest.TestCase):
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        json_out, tokens, lisp_tree, qt_model, error_summary, stats = analyze_and_transform(filename, content)
+        json_out, tokens, lisp_tree, qt_model, error_summary, stats = analyze_and_transform(filename, content, build_qt_model=False, build_lisp=False)
         
         # 1. JSON should be None (blocked by error)
         self.assertIsNone(json_out, f"JSON should not be generated for {filename}")
@@ -52,6 +48,3 @@ class TestSemanticAnalysis(unittest.TestCase):
         """Test SEM002: Reserved word as list name (Preempted by Syntax Error)"""
         # Note: This triggers a syntax error because 'ELEMENTOS' is a keyword.
         self._run_semantic_test('invalid_sem_reserved_lista.txt', "palabra reservada", expect_semantic_error=False)
-
-if __name__ == '__main__':
-    unittest.main()
@@ -0,0 +1,69 @@
+import pathlib
+
+import pytest
+
+import analyzer_core
+from analyzer_core import analyze_and_transform
+
+INPUTS_DIR = pathlib.Path(__file__).resolve().parent.parent / 'src' / 'ejemplos_entrada'
+INPUT_FILES = sorted(INPUTS_DIR.glob('*.txt'))
+
+# Mixes a big integer (forces the json fallback) with a small-exponent float in
+# another command: both modes must format the float the same way
+MIXED_NUMBERS_INPUT = (
+    'CREAR OBJETO grande CON n:' + '9' * 40 + '\n'
+    'CREAR OBJETO pequeno CON f:0.00000000123\n'
+    'CREAR LISTA valores CON ELEMENTOS -0.00000000123, 1.5, ' + '9' * 400 + '.5\n'
+)
+
+# The overwritten big integer must weigh the same in both modes: dict mode only
+# keeps x:1, stream mode sees every token before serializing anything
+DUPLICATE_KEY_INPUT = 'CREAR OBJETO a CON x:99999999999999999999999, x:1, y:0.00000000123'
+
+def _json_output(name, content):
+    json_out, _, _, _, _, _ = analyze_and_transform(name, content, build_qt_model=False, build_lisp=False)
+    return json_out
+
+def _json_stream_output(monkeypatch, name, content):
+    # Threshold 0: every document with at least one command is serialized per command
+    with monkeypatch.context() as m:
+        m.setattr(analyzer_core, "_JSON_STREAMING_THRESHOLD", 0)
+        return _json_output(name, content)
+
+@pytest.mark.parametrize("path", INPUT_FILES, ids=lambda p: p.name)
+def test_json_stream_matches_dict_mode(monkeypatch, path):
+    content = path.read_text(encoding='utf-8')
+    assert _json_stream_output(monkeypatch, path.name, content) == _json_output(path.name, content)
+
+def test_json_stream_matches_dict_mode_mixed_numbers(monkeypatch):
+    expected = _json_output("mixed", MIXED_NUMBERS_INPUT)
+    assert expected is not None
+    assert _json_stream_output(monkeypatch, "mixed", MIXED_NUMBERS_INPUT) == expected
+
+def test_json_stream_matches_dict_mode_duplicate_key(monkeypatch):
+    expected = _json_output("duplicate", DUPLICATE_KEY_INPUT)
+    assert expected is not None
+    assert _json_stream_output(monkeypatch, "duplicate", DUPLICATE_KEY_INPUT) == expected
+
+def _tokens_output(name, content):
+    _, tokens_out, _, _, _, _ = analyze_and_transform(name, content, build_qt_model=False, build_lisp=False)
+    return tokens_out
+
+@pytest.mark.parametrize("path", INPUT_FILES, ids=lambda p: p.name)
+def test_token_listing_stream_matches_join(monkeypatch, path):
+    content = path.read_text(encoding='utf-8')
+    expected = _tokens_output(path.name, content)
+    if "Token #0:" not in expected:
+        pytest.skip("no visible tokens: the io.StringIO branch never runs for an empty listing")
+    with monkeypatch.context() as m:
+        # Threshold 0: every non-empty listing goes through the io.StringIO branch
+        m.setattr(analyzer_core, "_TOKEN_STREAMING_THRESHOLD", 0)
+        assert _tokens_output(path.name, content) == expected
+
+def test_token_listing_stream_non_empty(monkeypatch):
+    content = 'CREAR OBJETO a CON x:1, y:"dos"\nCREAR LISTA l CON ELEMENTOS VERDADERO, 2.5'
+    expected = _tokens_output("tokens", content)
+    assert "Token #0:" in expected
+    with monkeypatch.context() as m:
+        m.setattr(analyzer_core, "_TOKEN_STREAMING_THRESHOLD", 0)
+        assert _tokens_output("tokens", content) == expected
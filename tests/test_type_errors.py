@@ -1,9 +1,5 @@
 import unittest
 import os
-import sys
-
-# Add src to path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
 from analyzer_core import analyze_and_transform
 
@@ -20,7 +16,7 @@ class TestTypeErrors(unittest.TestCase):
         with open(input_file, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        json_out, _, _, _, error_summary, stats = analyze_and_transform("invalid_type_edad.txt", content)
+        json_out, _, _, _, error_summary, stats = analyze_and_transform("invalid_type_edad.txt", content, build_qt_model=False, build_lisp=False)
         
         self.assertIsNone(json_out, "JSON should not be generated for semantic errors")
         self.assertGreater(stats['errores_semanticos'], 0, "Should have semantic errors")
@@ -36,7 +32,7 @@ class TestTypeErrors(unittest.TestCase):
         with open(input_file, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        json_out, _, _, _, error_summary, stats = analyze_and_transform("invalid_type_activo.txt", content)
+        json_out, _, _, _, error_summary, stats = analyze_and_transform("invalid_type_activo.txt", content, build_qt_model=False, build_lisp=False)
         
         self.assertIsNone(json_out, "JSON should not be generated for semantic errors")
         self.assertGreater(stats['errores_semanticos'], 0, "Should have semantic errors")
@@ -52,12 +48,9 @@ class TestTypeErrors(unittest.TestCase):
         with open(input_file, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        json_out, _, _, _, error_summary, stats = analyze_and_transform("invalid_consistency.txt", content)
+        json_out, _, _, _, error_summary, stats = analyze_and_transform("invalid_consistency.txt", content, build_qt_model=False, build_lisp=False)
         
         self.assertIsNone(json_out, "JSON should not be generated for semantic errors")
         self.assertGreater(stats['errores_semanticos'], 0, "Should have semantic errors")
         self.assertIn("edad", error_summary)
         self.assertIn("redefinirse", error_summary)
-
-if __name__ == '__main__':
-    unittest.main()
@@ -1,51 +1,70 @@
-import unittest
-import os
-import sys
-
-# Add src to path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
-
-from analyzer_core import analyze_and_transform
-
-class TestTypeInfrastructure(unittest.TestCase):
-    def setUp(self):
-        self.examples_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples', 'valid'))
-
-    def test_type_metadata_population(self):
-        """
-        Verifies that type metadata is correctly populated in the symbol table
-        and exposed via stats['symbols_debug'].
-        """
-        # Create a simple valid input directly
-        input_content = """
-        CREAR OBJETO usuario CON nombre:"Juan", edad:30, activo:VERDADERO
-        CREAR LISTA numeros CON ELEMENTOS 1, 2, 3
-        """
-        
-        json_out, _, _, _, _, stats = analyze_and_transform("test_input", input_content)
-        
-        self.assertIsNotNone(json_out, "JSON should be generated")
-        self.assertIn('symbols_debug', stats, "stats should contain 'symbols_debug'")
-        
-        symbols = stats['symbols_debug']
-        
-        # Verify 'usuario' object
-        self.assertIn('usuario', symbols)
-        usuario = symbols['usuario']
-        self.assertEqual(usuario['tipo_entidad'], 'objeto')
-        self.assertIn('propiedades', usuario['metadatos'])
-        props = usuario['metadatos']['propiedades']
-        self.assertEqual(props['nombre'], 'STRING')
-        self.assertEqual(props['edad'], 'NUMBER')
-        self.assertEqual(props['activo'], 'BOOLEAN')
-        
-        # Verify 'numeros' list
-        self.assertIn('numeros', symbols)
-        numeros = symbols['numeros']
-        self.assertEqual(numeros['tipo_entidad'], 'lista')
-        self.assertIn('tipos_elementos', numeros['metadatos'])
-        elements = numeros['metadatos']['tipos_elementos']
-        self.assertEqual(elements, ['NUMBER', 'NUMBER', 'NUMBER'])
-
-if __name__ == '__main__':
-    unittest.main()
+"""
+Type metadata tests for the symbol table (stats['symbols_debug']).
+
+PYTEST_DONT_REWRITE: pytest skips assertion rewriting for this module, so
+every assert carries an explicit message instead.
+"""
+
+from collections import Counter
+
+import pytest
+
+# Input analyzed by the whole module (built once, at import time)
+_INPUT_CONTENT = (
+    'CREAR OBJETO usuario CON nombre:"Juan", edad:30, activo:VERDADERO\n'
+    'CREAR LISTA numeros CON ELEMENTOS 1, 2, 3\n'
+)
+
+# Expected symbol table in the flat symbols_debug layout. Rows are compared
+# as multisets (Counter), so order does not matter but repeated rows do.
+EXPECTED = {
+    'names': ['usuario', 'numeros'],
+    'kinds': ['objeto', 'lista'],
+    'props': [('usuario', 'nombre', 'STRING'), ('usuario', 'edad', 'NUMBER'), ('usuario', 'activo', 'BOOLEAN')],
+    'elements': [('numeros', 'NUMBER')] * 3,
+}
+
+# Type metadata is populated in the symbol table and exposed via
+# stats['symbols_debug']. The input is analyzed once for the whole module.
+
+@pytest.fixture(scope='module')
+def analysis():
+    # Deferred import: collecting this module does not load the compiler (ANTLR, PyQt5).
+    # analyze_for_stats memoizes by (name, content) and returns a private copy of stats.
+    from analyzer_core import analyze_for_stats
+    return analyze_for_stats("test_input", _INPUT_CONTENT)
+
+@pytest.fixture(scope='module')
+def symbols(analysis):
+    _, stats = analysis
+    return stats.get('symbols_debug')
+
+def test_outputs_generated(analysis):
+    json_out, stats = analysis
+    assert json_out is not None, "JSON should be generated"
+    assert 'symbols_debug' in stats, "stats should contain 'symbols_debug'"
+
+def test_analysis_is_memoized(analysis):
+    from analyzer_core import analyze_for_stats
+    json_out, stats = analysis
+    json_again, stats_again = analyze_for_stats("test_input", _INPUT_CONTENT)
+    assert json_again is json_out, "memoized call should return the cached JSON string"
+    # Each call gets its own copy of stats
+    assert stats_again is not stats, "each call should get its own copy of stats"
+    assert stats_again['ir'] == stats['ir'], (
+        f"copied IR differs:\n  first:  {stats['ir']}\n  second: {stats_again['ir']}")
+
+def test_symbols_debug_is_read_only(symbols):
+    with pytest.raises(TypeError):
+        symbols['names'] = ()
+    assert set(symbols) == set(EXPECTED), f"unexpected fields: {sorted(symbols)}"
+
+def test_symbol_table_types(symbols):
+    # One structural comparison over the whole flat symbol table
+    actual = {field: Counter(symbols[field]) for field in EXPECTED}
+    expected = {field: Counter(rows) for field, rows in EXPECTED.items()}
+    assert actual == expected, f"symbol table mismatch:\n  actual:   {dict(symbols)}\n  expected: {EXPECTED}"
+
+def test_symbol_columns_are_parallel(symbols):
+    kinds = dict(zip(symbols['names'], symbols['kinds']))
+    assert kinds == {'usuario': 'objeto', 'numeros': 'lista'}, f"unexpected kinds: {kinds}"